@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 from pathlib import Path
 from typing import Any
 
@@ -64,8 +65,13 @@ def plot_series(
 
 
 # === 2) RENDERIZAÇÃO DO HTML (Jinja2) ========================================
+@functools.lru_cache(maxsize=1)
 def _jinja_env() -> Environment:
-    """Ambiente Jinja2 apontando para src/reports/templates."""
+    """
+    Ambiente Jinja2 apontando para src/reports/templates.
+    Criado uma única vez: o cache interno de templates compilados é reaproveitado
+    entre renderizações (o loader ainda recarrega se o arquivo mudar).
+    """
     return Environment(
         loader=FileSystemLoader(str(TEMPLATES_DIR)),
         autoescape=select_autoescape(enabled_extensions=("html", "j2")),
@@ -18,7 +18,7 @@ def _parse_urls(env_val: str | None) -> list[str]:
     """Divide SRAG_URLS por vírgula e remove espaços vazios."""
     if not env_val:
         return []
-    return [u.strip() for u in env_val.split(",") if u.strip()]
+    return [u for u in map(str.strip, env_val.split(",")) if u]
 
 
 # Garante diretório do arquivo do banco (se DB_PATH possuir subpastas)
@@ -78,8 +78,7 @@ def ingest() -> None:
         return
 
     # >>> lê SRAG_URLS dinamicamente também (env > default empacotado)
-    urls_env = os.getenv("SRAG_URLS", "")
-    urls = [u.strip() for u in urls_env.split(",") if u.strip()] or SRAG_URLS
+    urls = _parse_urls(os.getenv("SRAG_URLS")) or SRAG_URLS
 
     if not urls:
         raise RuntimeError(
@@ -172,8 +172,23 @@ def ingest_local(engine_fn, uf_default: str, cols: list[str], folder: str = "dat
 
     eng = engine_fn()
     with eng.begin() as conn:
-        # staging
-        full.to_sql("srag_staging", conn, if_exists="replace", index=False)
+        # Tabelas temporárias (CTAS/índices) em memória
+        conn.execute(text("PRAGMA temp_store=MEMORY"))
+
+        # staging: reaproveita a tabela (sem DROP/CREATE a cada ingestão)
+        conn.execute(
+            text("""
+            CREATE TABLE IF NOT EXISTS srag_staging (
+              DT_SIN_PRI TIMESTAMP,
+              EVOLUCAO INTEGER,
+              UTI INTEGER,
+              VACINA_COV INTEGER,
+              UF TEXT
+            )
+        """)
+        )
+        conn.execute(text("DELETE FROM srag_staging"))
+        full.to_sql("srag_staging", conn, if_exists="append", index=False)
 
         # base
         conn.execute(text("DROP TABLE IF EXISTS srag_base"))
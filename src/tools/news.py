@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import functools
+import io
 import json
 import os
 import random
@@ -21,6 +23,9 @@ API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "2"))
 API_BACKOFF_BASE = float(os.getenv("API_BACKOFF_BASE", "0.5"))
 DEFAULT_MODEL = os.getenv("OPENAI_SUMMARY_MODEL", "gpt-4o-mini")
 
+# Sessão HTTP compartilhada: reaproveita conexão TLS entre re-tentativas/chamadas
+_HTTP = requests.Session()
+
 
 # --------------------------------------------------------------------------- #
 # Helpers
@@ -39,14 +44,45 @@ def _is_offline() -> bool:
     return os.getenv("RUN_LIVE_API_TESTS", "0") != "1"
 
 
+@functools.lru_cache(maxsize=1)
+def _serper_key() -> str:
+    """SERPER_API_KEY lida uma vez; use `_serper_key.cache_clear()` para reler."""
+    return os.getenv("SERPER_API_KEY", "").strip()
+
+
+@functools.lru_cache(maxsize=1)
+def _openai_key() -> str:
+    """OPENAI_API_KEY lida uma vez; use `_openai_key.cache_clear()` para reler."""
+    return os.getenv("OPENAI_API_KEY", "").strip()
+
+
 def _get_openai_client() -> OpenAI | None:
-    """Cria cliente OpenAI no momento do uso (lendo env atual)."""
-    key = os.getenv("OPENAI_API_KEY", "").strip()
+    """
+    Cria cliente OpenAI no momento do uso. A chave NÃO é relida do ambiente a
+    cada chamada (`_openai_key` fica em cache): quem trocar OPENAI_API_KEY em
+    runtime deve chamar `_openai_key.cache_clear()` antes.
+    """
+    key = _openai_key()
     if not key:
         return None
     return OpenAI(api_key=key)
 
 
+def _local_fallback_enabled() -> bool:
+    """OPENAI_FALLBACK_LOCAL=1 → resumo extrativo local quando o LLM falha."""
+    return os.getenv("OPENAI_FALLBACK_LOCAL", "0") == "1"
+
+
+def _local_summary(items: list[dict]) -> str:
+    """Resumo extrativo barato: até 3 manchetes + respectivas fontes."""
+    top = items[:3]
+    titles = " | ".join(str(i.get("title") or "").strip() for i in top)
+    sources = ", ".join(
+        dict.fromkeys(str(i.get("source") or "").strip() for i in top if i.get("source"))
+    )
+    return f"Destaques: {titles}" + (f" (fontes: {sources})" if sources else "")
+
+
 # --------------------------------------------------------------------------- #
 # Busca de notícias (Serper)
 # --------------------------------------------------------------------------- #
@@ -61,7 +97,7 @@ def search_news(query: str, num: int = 5, run_id: str | None = None) -> list[dic
         log_kv(run_id or "n/a", "serper.offline", reason="RUN_LIVE_API_TESTS!=1")
         return []
 
-    serper_key = os.getenv("SERPER_API_KEY", "").strip()
+    serper_key = _serper_key()
     if not serper_key:
         log_kv(run_id or "n/a", "serper.disabled", reason="missing_api_key")
         return []
@@ -75,7 +111,7 @@ def search_news(query: str, num: int = 5, run_id: str | None = None) -> list[dic
     last_err: str | None = None
     for attempt in range(API_MAX_RETRIES + 1):
         try:
-            r = requests.post(url, json=payload, headers=headers, timeout=API_TIMEOUT)
+            r = _HTTP.post(url, json=payload, headers=headers, timeout=API_TIMEOUT)
 
             # 429/5xx → retry
             if r.status_code in (429, 500, 502, 503, 504):
@@ -137,6 +173,7 @@ def summarize_news(items: list[dict], run_id: str | None = None) -> str:
     Sumariza itens com OpenAI, com timeout e retries em erros transitórios.
     - Em modo OFFLINE → retorna fallback determinístico (sem rede).
     - Se OPENAI_API_KEY ausente → fallback.
+    - Com OPENAI_FALLBACK_LOCAL=1, falha após retries → resumo extrativo local.
     """
     if not items:
         return "Sem notícias recentes encontradas."
@@ -151,9 +188,18 @@ def summarize_news(items: list[dict], run_id: str | None = None) -> str:
         log_kv(run_id or "n/a", "openai.disabled", reason="missing_api_key")
         return "Resumo de notícias indisponível (OPENAI_API_KEY ausente)."
 
-    bullets = "\n".join(
-        f"- {i.get('title')} ({i.get('source')}) – {i.get('link')}" for i in items
-    )
+    # Monta as manchetes num único buffer (evita strings intermediárias por item)
+    buf = io.StringIO()
+    w = buf.write
+    for it in items:
+        w("- ")
+        w(str(it.get("title") or ""))
+        w(" (")
+        w(str(it.get("source") or ""))
+        w(") – ")
+        w(str(it.get("link") or ""))
+        w("\n")
+    bullets = buf.getvalue().rstrip("\n")
     prompt = (
         "Você é um analista epidemiológico. Resuma, em 4–6 frases, "
         "o panorama de SRAG no Brasil com base nas manchetes abaixo. "
@@ -200,6 +246,9 @@ def summarize_news(items: list[dict], run_id: str | None = None) -> str:
             if attempt < API_MAX_RETRIES:
                 _sleep_backoff(attempt)
                 continue
+            if _local_fallback_enabled():
+                log_kv(run_id or "n/a", "openai.fallback.local", error=last_err)
+                return _local_summary(items)
             raise
 
         # Fallback genérico (qualquer outro erro não-óbvio)
@@ -218,6 +267,9 @@ def summarize_news(items: list[dict], run_id: str | None = None) -> str:
             if retryable and attempt < API_MAX_RETRIES:
                 _sleep_backoff(attempt)
                 continue
+            if _local_fallback_enabled():
+                log_kv(run_id or "n/a", "openai.fallback.local", error=last_err)
+                return _local_summary(items)
             raise
 
     raise RuntimeError(f"OpenAI summarize failed after retries: {last_err}")
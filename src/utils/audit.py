@@ -1,34 +1,77 @@
 # src/utils/audit.py
 from __future__ import annotations
 
+import atexit
 from contextlib import contextmanager
-import datetime
+import functools
 import hashlib
 import json
 import os
+import queue
+import sys
+import threading
 import time
 import traceback
+import types
 from typing import Any
-import uuid
 
-# === Config via .env ===
-LOG_DIR = os.getenv("LOG_DIR", "resources/json")
-LOG_FILE = os.getenv("LOG_FILE", os.path.join(LOG_DIR, "events.jsonl"))
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()  # INFO | DEBUG
-SANITIZE = os.getenv("LOG_SANITIZE", "1") == "1"  # 1 = mascara prompts/segredos
+try:  # serialização rápida (opcional); cai para json da stdlib
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
 
-# Garante diretório
-os.makedirs(LOG_DIR, exist_ok=True)
+
+# === Config via .env (lida sob demanda, na 1ª escrita) ===
+@functools.lru_cache(maxsize=1)
+def _config() -> types.SimpleNamespace:
+    """
+    Lê LOG_DIR/LOG_FILE/LOG_LEVEL/LOG_SANITIZE do ambiente uma única vez.
+    Use `_config.cache_clear()` para reler (ex.: em testes), sem reload do módulo.
+    """
+    log_dir = os.getenv("LOG_DIR", "resources/json")
+    return types.SimpleNamespace(
+        log_dir=log_dir,
+        log_file=os.getenv("LOG_FILE", os.path.join(log_dir, "events.jsonl")),
+        debug=os.getenv("LOG_LEVEL", "INFO").upper() == "DEBUG",  # INFO | DEBUG
+        sanitize=os.getenv("LOG_SANITIZE", "1") == "1",  # 1 = mascara prompts/segredos
+    )
+
+
+# Protege o handle do arquivo (escrita/reabertura)
+_LOCK = threading.Lock()
+
+
+def _dumps(obj: Any) -> bytes:
+    """
+    Serializa em JSON (UTF-8, sem escapar acentos) com orjson, se disponível.
+    O que o orjson recusa (ex.: int > 64 bits) cai para o json da stdlib:
+    um evento de log nunca deve derrubar quem o emitiu.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                obj,
+                default=str,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+            )
+        except TypeError:  # orjson.JSONEncodeError é subclasse de TypeError
+            pass
+    return json.dumps(obj, ensure_ascii=False, default=str).encode("utf-8")
 
 
 def _now() -> str:
-    """Timestamp ISO8601 com milissegundos (UTC)."""
-    return datetime.datetime.now(datetime.UTC).isoformat(timespec="milliseconds") + "Z"
+    """Timestamp ISO8601 com milissegundos (UTC), ex.: 2025-01-01T12:00:00.123Z."""
+    s, ms = divmod(time.time_ns() // 1_000_000, 1000)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(s)) + f".{ms:03d}Z"
 
 
-def _hash(text: str) -> str:
-    """Hash curto para identificar conteúdo sem expor texto completo."""
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+def _hash(text: str | bytes) -> str:
+    """
+    Hash curto (12 hex) para identificar conteúdo sem expor texto completo.
+    Não é uso criptográfico: BLAKE2b com digest de 6 bytes basta e é mais barato.
+    """
+    data = text if isinstance(text, bytes) else text.encode("utf-8")
+    return hashlib.blake2b(data, digest_size=6).hexdigest()
 
 
 def _truncate(s: str | None, max_len: int = 1000) -> str | None:
@@ -39,23 +82,112 @@ def _truncate(s: str | None, max_len: int = 1000) -> str | None:
 
 
 # ---------- Sanitização (recursiva) ----------
-_SENSITIVE_KEYS = {
-    # comuns
-    "api_key",
-    "apikey",
-    "key",
-    "authorization",
-    "bearer",
-    "token",
-    "access_token",
-    "secret",
-    "password",
-    # nomes específicos do projeto
-    "openai_api_key",
-    "serper_api_key",
+_SENSITIVE_KEYS = frozenset(
+    {
+        # comuns
+        "api_key",
+        "apikey",
+        "key",
+        "authorization",
+        "bearer",
+        "token",
+        "access_token",
+        "secret",
+        "password",
+        # nomes específicos do projeto
+        "openai_api_key",
+        "serper_api_key",
+    }
+)
+# Sufixos sensíveis (checados de uma vez via str.endswith(tuple))
+_SENSITIVE_SUFFIXES = ("api_key", "token", "secret")
+
+
+def _sanitize_dict(
+    value: dict, key_hint: str | None = None, out: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """
+    Sanitiza um dicionário (chaves sensíveis, prompt, messages).
+    Com `out`, grava direto nele (evita um dict intermediário no registro).
+    """
+    if out is None:
+        out = {}
+    for key, vv in value.items():
+        kl = key.lower() if isinstance(key, str) else str(key).lower()
+
+        # Campos sensíveis por nome (em qualquer nível)
+        if kl in _SENSITIVE_KEYS or kl.endswith(_SENSITIVE_SUFFIXES):
+            out[key] = "[REDACTED]"
+            continue
+
+        # Prompt: substitui por hash + preview (independente do nível)
+        if kl == "prompt":
+            if isinstance(vv, str):
+                out[key] = {"sha": _hash(vv), "preview": _truncate(vv, 300)}
+            else:
+                # prompt não-string -> sanitiza recursivamente
+                out[key] = _sanitize_value(vv, kl)
+            continue
+
+        # Messages (padrão OpenAI): não logar conteúdo bruto
+        if kl == "messages":
+            try:
+                # Codificação canônica (json da stdlib, compacta): o fingerprint
+                # não pode depender de orjson estar instalado ou não
+                txt = json.dumps(
+                    vv, separators=(",", ":"), ensure_ascii=False, default=str
+                )
+            except Exception:
+                txt = str(vv)
+            count = len(vv) if isinstance(vv, list) else None
+            out[key] = {"sha": _hash(txt), "count": count}
+            continue
+
+        # Caso geral: segue recursivamente
+        out[key] = _sanitize_value(vv, kl)
+    return out
+
+
+def _sanitize_list(value: list | tuple, key_hint: str | None = None) -> list[Any]:
+    """Sanitiza cada item de listas/tuplas."""
+    return [_sanitize_value(x, key_hint) for x in value]
+
+
+def _truncate_str(value: str, key_hint: str | None = None) -> str:
+    """Strings: truncamento defensivo (ex.: stack traces gigantes)."""
+    return _truncate(value, 1000)
+
+
+def _ident(value: Any, key_hint: str | None = None) -> Any:
+    """Escalares (int/float/bool/None) permanecem como estão."""
+    return value
+
+
+# Despacho por tipo exato: 1 lookup em vez da cadeia de isinstance
+_HANDLERS = {
+    int: _ident,
+    float: _ident,
+    bool: _ident,
+    type(None): _ident,
+    str: _truncate_str,
+    dict: _sanitize_dict,
+    list: _sanitize_list,
+    tuple: _sanitize_list,
 }
 
 
+def _sanitize_value_slow(value: Any, key_hint: str | None = None) -> Any:
+    """Caminho genérico para subclasses (ex.: OrderedDict, numpy.float64)."""
+    if isinstance(value, dict):
+        return _sanitize_dict(value, key_hint)
+    if isinstance(value, list | tuple):
+        return _sanitize_list(value, key_hint)
+    if isinstance(value, str):
+        return _truncate_str(value, key_hint)
+    # Demais tipos permanecem
+    return value
+
+
 def _sanitize_value(value: Any, key_hint: str | None = None) -> Any:
     """
     Sanitiza recursivamente valores de dicionários/listas:
@@ -64,54 +196,10 @@ def _sanitize_value(value: Any, key_hint: str | None = None) -> Any:
     - `messages` (lista/objeto) -> {sha, count}
     - Strings muito longas são truncadas para evitar vazamento acidental
     """
-    # Dicionários
-    if isinstance(value, dict):
-        out: dict[str, Any] = {}
-        for key, vv in value.items():
-            kl = str(key).lower()
-
-            # Campos sensíveis por nome (em qualquer nível)
-            if (
-                kl in _SENSITIVE_KEYS
-                or kl.endswith("api_key")
-                or kl.endswith("access_token")
-            ):
-                out[key] = "[REDACTED]"
-                continue
-
-            # Prompt: substitui por hash + preview (independente do nível)
-            if kl == "prompt":
-                if isinstance(vv, str):
-                    out[key] = {"sha": _hash(vv), "preview": _truncate(vv, 300)}
-                else:
-                    # prompt não-string -> sanitiza recursivamente
-                    out[key] = _sanitize_value(vv, kl)
-                continue
-
-            # Messages (padrão OpenAI): não logar conteúdo bruto
-            if kl == "messages":
-                try:
-                    txt = json.dumps(vv, ensure_ascii=False)
-                except Exception:
-                    txt = str(vv)
-                count = len(vv) if isinstance(vv, list) else None
-                out[key] = {"sha": _hash(txt), "count": count}
-                continue
-
-            # Caso geral: segue recursivamente
-            out[key] = _sanitize_value(vv, kl)
-        return out
-
-    # Listas / tuplas
-    if isinstance(value, list | tuple):
-        return [_sanitize_value(x, key_hint) for x in value]
-
-    # Strings: truncamento defensivo (ex.: stack traces gigantes)
-    if isinstance(value, str):
-        return _truncate(value, 1000)
-
-    # Demais tipos permanecem
-    return value
+    h = _HANDLERS.get(type(value))
+    if h is not None:
+        return h(value, key_hint)
+    return _sanitize_value_slow(value, key_hint)
 
 
 def sanitize_payload(d: dict[str, Any]) -> dict[str, Any]:
@@ -121,7 +209,7 @@ def sanitize_payload(d: dict[str, Any]) -> dict[str, Any]:
     - Chaves típicas (api_key, token, authorization, etc.) viram "[REDACTED]".
     - 'prompt' vira {sha, preview}, e 'messages' vira {sha, count}.
     """
-    if not SANITIZE:
+    if not _config().sanitize:
         return d
     try:
         return _sanitize_value(d)
@@ -130,28 +218,188 @@ def sanitize_payload(d: dict[str, Any]) -> dict[str, Any]:
         return d
 
 
+# POSIX: fd em O_APPEND + os.write (append atômico por linha, sem buffer Python);
+# Windows: mantém o file object bufferizado.
+_USE_FD = os.name == "posix"
+
+
+def _open_log(path: str):
+    """Abre o arquivo de log em append (handle único, reaproveitado)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if _USE_FD:
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | os.O_CLOEXEC
+        return os.open(path, flags, 0o644)
+    return open(path, "ab", buffering=1 << 16)
+
+
+def _fileno() -> int:
+    return _FH if _USE_FD else _FH.fileno()
+
+
+def _close_log() -> None:
+    """Fecha o handle atual (idempotente)."""
+    global _FH, _FH_PATH
+    if _FH is None:
+        return
+    if _USE_FD:
+        os.close(_FH)
+    else:
+        _FH.close()
+    _FH = _FH_PATH = None
+
+
+# Handle persistente, aberto na 1ª escrita (evita open/close a cada evento)
+_FH = None
+_FH_PATH: str | None = None
+
+
+def _write(data: bytes) -> None:
+    """Grava um lote de linhas JSONL no handle persistente."""
+    global _FH, _FH_PATH
+    with _LOCK:
+        path = _config().log_file
+        if _FH is None or _FH_PATH != path:
+            _close_log()
+            _FH, _FH_PATH = _open_log(path), path
+        if _USE_FD:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(_FH, view) :]
+        else:
+            _FH.write(data)
+            _FH.flush()
+
+
+# Aviso único no stderr para falhas de escrita (o erro em si vai para o flush)
+_WRITE_ERROR_REPORTED = False
+
+
+def _record_write_error(e: Exception) -> None:
+    """Avisa no stderr (uma vez por processo) que a gravação do log falhou."""
+    global _WRITE_ERROR_REPORTED
+    if not _WRITE_ERROR_REPORTED:
+        _WRITE_ERROR_REPORTED = True
+        print(f"[audit] falha ao gravar eventos: {e!r}", file=sys.stderr)
+
+
+class _FlushRequest:
+    """Marcador de flush na fila: sinaliza a conclusão e carrega o erro do lote."""
+
+    __slots__ = ("done", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.error: Exception | None = None
+
+
+def _writer(q: queue.SimpleQueue) -> None:
+    """
+    Thread de escrita: drena a fila em lotes (uma escrita por lote) e
+    sinaliza os pedidos de flush após gravar o que veio antes. Uma falha de
+    escrita é entregue apenas ao(s) flush(es) seguinte(s) – nunca a um
+    flush posterior, de outro lote.
+    """
+    pending: Exception | None = None  # falha desde o último flush atendido
+    while True:
+        item = q.get()
+        batch: list[bytes] = []
+        waiters: list[_FlushRequest] = []
+        while True:
+            if isinstance(item, _FlushRequest):
+                waiters.append(item)
+            else:
+                batch.append(item)
+            try:
+                item = q.get_nowait()
+            except queue.Empty:
+                break
+        if batch:
+            try:
+                _write(b"".join(batch))
+            except Exception as e:
+                # log nunca deve derrubar a thread: avisa e entrega ao flush
+                _record_write_error(e)
+                pending = e
+        if waiters:
+            for w in waiters:
+                w.error = pending
+                w.done.set()
+            pending = None
+
+
+# Fila de linhas a gravar + thread de escrita em background (fora do hot path)
+_Q: queue.SimpleQueue = queue.SimpleQueue()
+_WRITER = threading.Thread(target=_writer, args=(_Q,), name="audit-writer", daemon=True)
+_WRITER.start()
+
+
+def flush(fsync: bool = False, timeout: float = 5.0, raise_errors: bool = True) -> bool:
+    """
+    Aguarda a gravação de todos os eventos enfileirados até aqui.
+    Retorna False se a thread não concluir em `timeout` (nada é confirmado
+    nem sincronizado). Com `raise_errors`, re-levanta a falha de escrita
+    ocorrida desde o flush anterior.
+    """
+    req = _FlushRequest()
+    _Q.put(req)
+    if not req.done.wait(timeout):
+        return False
+    if raise_errors and req.error is not None:
+        raise req.error
+    if fsync:
+        with _LOCK:
+            if _FH is not None:
+                os.fsync(_fileno())
+    return True
+
+
+def _close() -> None:
+    """Esvazia a fila e fecha o handle no encerramento do processo."""
+    flush(raise_errors=False)
+    with _LOCK:
+        _close_log()
+
+
+atexit.register(_close)
+
+
 def write_event(event: str, level: str = "INFO", **payload):
     """
     Grava um evento estruturado (uma linha JSON).
     Use nível DEBUG apenas quando LOG_LEVEL=DEBUG.
+    A gravação é feita por uma thread em background; erros são gravados
+    de forma síncrona (flush + fsync) para não se perderem em crash – uma
+    falha de escrita desse lote é re-levantada nesse momento, e um flush que
+    expira é avisado no stderr.
     """
-    if level == "DEBUG" and LOG_LEVEL != "DEBUG":
+    cfg = _config()
+    if not cfg.debug and level == "DEBUG":
         return
-    rec = {
-        "ts": _now(),
-        "level": level,
-        "event": event,
-        **sanitize_payload(payload),
-    }
-    # Escrita simples em append; flush imediato para não perder eventos em crash.
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
-        f.flush()
+    if cfg.sanitize:
+        # Sanitiza direto no registro final (sem cópia intermediária do payload)
+        rec = {"ts": _now(), "level": level, "event": event}
+        try:
+            _sanitize_dict(payload, out=rec)
+        except Exception:
+            # Qualquer erro de sanitização não deve quebrar o log.
+            rec.update(payload)
+    else:
+        # Sem sanitização: reaproveita o dict de kwargs (sempre novo, deste call)
+        rec = payload
+        rec["ts"] = _now()
+        rec["level"] = level
+        rec["event"] = event
+    line = _dumps(rec) + b"\n"
+    _Q.put(line)
+    # Erros vão direto para o disco (com fsync) para não se perderem em crash.
+    if level == "ERROR" or event.endswith(".error"):
+        if not flush(fsync=level == "ERROR"):
+            print(f"[audit] evento {event!r} não confirmado em disco", file=sys.stderr)
 
 
 def new_run_id() -> str:
-    """Id único por execução (usado para correlacionar spans)."""
-    return str(uuid.uuid4())
+    """Id único por execução (usado para correlacionar spans); 32 chars hex."""
+    return os.urandom(16).hex()
 
 
 @contextmanager
@@ -159,13 +407,14 @@ def audit_span(event: str, run_id: str, node: str | None = None, **ctx):
     """
     Context manager para instrumentar um “span”.
     Registra: <event>.start / <event>.end / <event>.error
+    O traceback completo no .error só é gravado com LOG_LEVEL=DEBUG.
     """
-    span_id = str(uuid.uuid4())
-    t0 = time.perf_counter()
+    span_id = os.urandom(16).hex()
+    t0 = time.perf_counter_ns()
     write_event(f"{event}.start", run_id=run_id, span_id=span_id, node=node, **ctx)
     try:
         yield {"run_id": run_id, "span_id": span_id}
-        dur = int((time.perf_counter() - t0) * 1000)
+        dur = (time.perf_counter_ns() - t0) // 1_000_000
         write_event(
             f"{event}.end",
             run_id=run_id,
@@ -175,21 +424,35 @@ def audit_span(event: str, run_id: str, node: str | None = None, **ctx):
             ok=True,
         )
     except Exception as e:
-        dur = int((time.perf_counter() - t0) * 1000)
-        write_event(
-            f"{event}.error",
-            level="ERROR",
-            run_id=run_id,
-            span_id=span_id,
-            node=node,
-            duration_ms=dur,
-            ok=False,
-            error=str(e),
-            traceback=traceback.format_exc(),
-        )
+        dur = (time.perf_counter_ns() - t0) // 1_000_000
+        # Traceback completo só em DEBUG (formatar a pilha é caro)
+        extra = {"traceback": traceback.format_exc()} if _config().debug else {}
+        try:
+            write_event(
+                f"{event}.error",
+                level="ERROR",
+                run_id=run_id,
+                span_id=span_id,
+                node=node,
+                duration_ms=dur,
+                ok=False,
+                error=str(e),
+                error_type=type(e).__name__,
+                **extra,
+            )
+        except Exception as log_err:
+            # A falha do log não substitui a exceção real do span
+            e.add_note(f"[audit] falha ao registrar {event}.error: {log_err!r}")
         raise
 
 
 def log_kv(run_id: str, event: str, **kv):
     """Atalho para eventos simples (chave-valor)."""
     write_event(event, run_id=run_id, **kv)
+
+
+def log_kv_debug(run_id: str, event: str, **kv):
+    """Evento chave-valor em nível DEBUG (descartado de imediato fora de DEBUG)."""
+    if not _config().debug:
+        return
+    write_event(event, level="DEBUG", run_id=run_id, **kv)
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-import datetime
-
+import numpy as np
 import pandas as pd
 
 from src.utils import VALID_UFS
@@ -9,6 +8,9 @@ from src.utils import VALID_UFS
 
 def validate_uf(uf: str) -> str:
     """Normaliza e valida UF; lança ValueError se inválida."""
+    # Caminho rápido: UF já canônica (ex.: "SP") dispensa strip/upper
+    if uf in VALID_UFS:
+        return uf
     if not uf:
         raise ValueError("UF vazia.")
     u = uf.strip().upper()
@@ -17,7 +19,7 @@ def validate_uf(uf: str) -> str:
     return u
 
 
-def clamp_future_dates(df: pd.DataFrame, col: str) -> pd.DataFrame:
+def clamp_future_dates(df: pd.DataFrame, col: str, copy: bool = True) -> pd.DataFrame:
     """
     Remove registros cuja data em `col` esteja no futuro (> hoje).
     Retorna um novo DataFrame (cópia), mantendo o schema original.
@@ -26,26 +28,34 @@ def clamp_future_dates(df: pd.DataFrame, col: str) -> pd.DataFrame:
     - Converte `df[col]` para datetime (coerce NaT para valores inválidos).
     - Se a coluna tiver timezone, remove o timezone (torna naive).
     - Compara com 'hoje' (UTC) sem timezone para evitar erros de comparação.
+    - Sem a coluna `col`, devolve `df` (cópia apenas se `copy=True`).
     """
     if col not in df.columns:
-        return df.copy()
+        return df.copy() if copy else df
 
-    # Converte para datetime; valores inválidos viram NaT
-    s = pd.to_datetime(df[col], errors="coerce")
+    # Converte para datetime (se ainda não for); valores inválidos viram NaT
+    s = df[col]
+    if not pd.api.types.is_datetime64_any_dtype(s):
+        s = pd.to_datetime(s, errors="coerce")
 
     # Se vier com timezone, remove (naive) para comparação consistente
     # (checamos o dtype da Series, não a Series em si)
     if isinstance(s.dtype, pd.DatetimeTZDtype):
         s = s.dt.tz_localize(None)
 
-    # 'Hoje' como Timestamp naive (UTC) para evitar tz mismatch
-    today = pd.Timestamp(datetime.datetime.now(datetime.UTC).date())
+    # 'Hoje' (UTC, meia-noite) como Timestamp naive para evitar tz mismatch
+    today = pd.Timestamp.now("UTC").tz_localize(None).normalize()
+
+    # Comparação vetorizada na PRÓPRIA unidade da coluna (s/ms/us/ns): converter
+    # para ns estouraria datas fora de ~1677–2262 e mudaria o schema
+    values = s.to_numpy()
+    today_np = today.to_datetime64().astype(values.dtype)
+    mask = ~np.isnat(values) & (values <= today_np)
 
     # Mantém linhas com data válida e <= hoje
-    mask = (s.notna()) & (s <= today)
     out = df.loc[mask].copy()
 
     # Garante que a coluna no output fica normalizada (datetime naive)
-    out[col] = s.loc[mask].values
+    out[col] = values[mask]
 
     return out
@@ -0,0 +1,144 @@
+import datetime
+import importlib
+import os
+import pathlib
+
+from dotenv import find_dotenv, load_dotenv
+import numpy as np
+import pandas as pd
+import pytest
+
+# Variáveis do .env consultadas pelos testes (lidas uma única vez por sessão)
+ENV_KEYS = (
+    "DB_PATH",
+    "UF_INICIAL",
+    "INGEST_MODE",
+    "NEWS_QUERY",
+    "OPENAI_API_KEY",
+    "SERPER_API_KEY",
+    "SRAG_URLS",
+)
+
+_ONE_DAY = pd.Timedelta(days=1)
+
+
+def pytest_configure(config) -> None:
+    """
+    Carrega o .env antes da coleta (sem sobrescrever variáveis já definidas),
+    para que marcas `skipif` avaliadas no import já enxerguem RUN_LIVE_API_TESTS.
+    """
+    env_file = find_dotenv(filename=".env", usecwd=True)
+    if env_file:
+        load_dotenv(env_file, override=False)
+
+
+@pytest.fixture(scope="session")
+def env_snapshot() -> dict[str, str | None]:
+    """Foto do ambiente após o .env (None = variável ausente)."""
+    return {k: os.environ.get(k) for k in ENV_KEYS}
+
+
+@pytest.fixture
+def offline_stubs(monkeypatch):
+    """
+    Stubs determinísticos comuns no namespace do orquestrador: ingestão no-op e
+    notícias sem rede (busca vazia + resumo de fallback). Retorna o módulo.
+    """
+    import src.agents.orchestrator as orchestrator
+
+    monkeypatch.setattr(orchestrator, "ingest_csvs", lambda: None)
+    monkeypatch.setattr(orchestrator, "search_news", lambda q, num=5, run_id=None: [])
+    monkeypatch.setattr(
+        orchestrator,
+        "summarize_news",
+        lambda items, run_id=None: "Sem notícias recentes encontradas.",
+    )
+    return orchestrator
+
+
+def _reload_pipeline():
+    """
+    Recarrega os módulos que leem o ambiente no import (inclusive as configs
+    centralizadas em `src/__init__.py`); retorna o orquestrador.
+    """
+    import src
+    import src.agents.orchestrator as orchestrator
+    import src.tools.db_orchestrator as db_orchestrator
+    import src.tools.news as news
+
+    importlib.reload(src)
+    importlib.reload(db_orchestrator)
+    importlib.reload(news)
+    importlib.reload(orchestrator)
+    return orchestrator
+
+
+@pytest.fixture(scope="session")
+def offline_run() -> dict:
+    """
+    Executa `run_pipeline("SP")` OFFLINE (ingestão local, sem chaves) uma única
+    vez por sessão e reaproveita a saída. O ambiente alterado vale só durante a
+    execução: em seguida é restaurado e os módulos recarregados de novo, para
+    não vazar INGEST_MODE/chaves para fixtures e testes seguintes.
+    """
+    mp = pytest.MonkeyPatch()
+    mp.setenv("INGEST_MODE", "local")
+    mp.setenv("OPENAI_API_KEY", "")
+    mp.setenv("SERPER_API_KEY", "")
+    try:
+        return _reload_pipeline().run_pipeline("SP")
+    finally:
+        mp.undo()
+        _reload_pipeline()
+
+
+@pytest.fixture(scope="session")
+def report_html(tmp_path_factory) -> tuple[pathlib.Path, str, str]:
+    """
+    Renderiza um relatório mínimo uma única vez por sessão, num diretório
+    temporário (não toca em resources/reports/), e lê o HTML uma só vez.
+    Retorna (caminho, html, html em minúsculas) – `.lower()` feito uma só vez.
+    """
+    import src.reports.render as render
+
+    ctx = {
+        "uf": "SP",
+        "increase_rate": 0.12,
+        "mortality_rate": 0.034,
+        "icu_rate": 0.18,
+        "vaccination_rate": 0.77,
+        # use caminhos RELATIVOS; o orquestrador normalmente usa 'charts/...'
+        "chart_30d": "charts/casos_30d.png",
+        "chart_12m": "charts/casos_12m.png",
+        "news_summary": "Resumo fake para testes.",
+        "now": "01/01/2025 00:00",
+    }
+    mp = pytest.MonkeyPatch()
+    mp.setattr(render, "REPORTS_DIR", tmp_path_factory.mktemp("reports"))
+    try:
+        p = pathlib.Path(render.render_html(ctx))
+    finally:
+        mp.undo()
+    html = p.read_text(encoding="utf-8")
+    return p, html, html.lower()
+
+
+@pytest.fixture(scope="session")
+def today_utc() -> pd.Timestamp:
+    """
+    "Hoje" com a mesma referência de `clamp_future_dates`: data em UTC
+    (timezone-aware -> date -> Timestamp naive), calculado uma vez por sessão.
+    """
+    return pd.Timestamp(datetime.datetime.now(datetime.UTC).date())
+
+
+@pytest.fixture
+def future_df(today_utc) -> pd.DataFrame:
+    """Duas linhas: uma de hoje e uma de amanhã (a ser descartada)."""
+    # Colunas já tipadas (datetime64 / int64): sem inferência a partir de listas
+    return pd.DataFrame(
+        {
+            "day": pd.DatetimeIndex([today_utc, today_utc + _ONE_DAY]),
+            "cases": np.array([1, 2], dtype=np.int64),
+        }
+    )
@@ -1,21 +1,38 @@
-import importlib
 import json
 import pathlib
 
+import pytest
 
-def test_audit_span_and_events(tmp_path, monkeypatch):
-    # 1) Redireciona log para uma pasta/arquivo temporários
+import src.utils.audit as audit
+
+
+@pytest.fixture
+def audit_tmp(tmp_path, monkeypatch):
+    """
+    Redireciona o log para uma pasta/arquivo temporários e descarta a config em
+    cache (sem importlib.reload). No teardown – mesmo se o teste falhar –
+    restaura o ambiente e a config para os demais testes.
+    """
     log_dir = tmp_path / "logs"
-    log_file = log_dir / "events.jsonl"
     monkeypatch.setenv("LOG_DIR", str(log_dir))
-    monkeypatch.setenv("LOG_FILE", str(log_file))
+    monkeypatch.setenv("LOG_FILE", str(log_dir / "events.jsonl"))
     monkeypatch.setenv("LOG_SANITIZE", "1")  # mantém sanitização ligada
+    monkeypatch.setenv("LOG_LEVEL", "INFO")  # DEBUG só quando o teste pedir
+    # Aviso de falha de escrita "uma vez por processo": cada teste começa do
+    # zero e o undo restaura o valor, sem silenciar o aviso no resto da sessão
+    monkeypatch.setattr(audit, "_WRITE_ERROR_REPORTED", False)
 
-    # 2) Recarrega o módulo DEPOIS de configurar o ambiente,
-    #    pois ele lê LOG_DIR/LOG_FILE ao importar
-    import src.utils.audit as audit
+    audit.flush(raise_errors=False)
+    audit._config.cache_clear()
+    yield audit
+    audit.flush(raise_errors=False)
+    monkeypatch.undo()
+    audit._config.cache_clear()
 
-    audit = importlib.reload(audit)
+
+def test_audit_span_and_events(audit_tmp):
+    # 1-2) Log redirecionado para o tmp pela fixture `audit_tmp`
+    audit = audit_tmp
 
     run_id = audit.new_run_id()
 
@@ -31,7 +48,8 @@ def test_audit_span_and_events(tmp_path, monkeypatch):
         pass  # esperado
 
     # 5) Lê o arquivo JSONL que o módulo realmente usa
-    p = pathlib.Path(audit.LOG_FILE)
+    audit.flush()
+    p = pathlib.Path(audit._config().log_file)
     assert p.exists(), f"Log JSONL não foi escrito em {p}."
     content = p.read_text(encoding="utf-8").strip()
     assert content, "Log JSONL está vazio."
@@ -59,3 +77,116 @@ def test_audit_span_and_events(tmp_path, monkeypatch):
     error_events = [e for e in events if e["event"].endswith(".error")]
     assert all("duration_ms" in e for e in end_events), "Span .end sem duration_ms"
     assert all("duration_ms" in e for e in error_events), "Span .error sem duration_ms"
+
+    # .error traz o tipo da exceção; traceback só em DEBUG (aqui: INFO)
+    err = next(e for e in events if e["event"] == "unit_test_error.error")
+    assert err["error_type"] == "ValueError"
+    assert "traceback" not in err
+
+
+def test_span_error_traceback_in_debug(audit_tmp, monkeypatch):
+    monkeypatch.setenv("LOG_LEVEL", "DEBUG")
+    audit_tmp._config.cache_clear()
+
+    with pytest.raises(ValueError):
+        with audit_tmp.audit_span("unit_test_debug", "r"):
+            raise ValueError("boom")
+    audit_tmp.flush()
+
+    lines = pathlib.Path(audit_tmp._config().log_file).read_text("utf-8").splitlines()
+    err = json.loads(lines[-1])
+    assert err["event"] == "unit_test_debug.error"
+    assert err["error_type"] == "ValueError"
+    assert "ValueError: boom" in err["traceback"]
+
+
+def test_write_failure_is_reported_by_flush(audit_tmp, tmp_path, monkeypatch, capsys):
+    # Pai do LOG_FILE é um arquivo → a abertura do log falha na thread de escrita
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("x", encoding="utf-8")
+    monkeypatch.setenv("LOG_FILE", str(blocker / "events.jsonl"))
+    audit_tmp._config.cache_clear()
+
+    audit_tmp.write_event("unit_test.lost")
+    with pytest.raises(OSError):
+        audit_tmp.flush()
+
+    # O erro é entregue uma única vez
+    audit_tmp.flush()
+    # ...e avisado no stderr (uma vez)
+    assert capsys.readouterr().err.count("[audit] falha ao gravar eventos") == 1
+
+
+def test_write_event_redacts_sensitive_fields(audit_tmp):
+    # Passa por write_event (sanitização direto no registro, `out=rec`)
+    msgs = [{"role": "user", "content": "segredo no prompt"}]
+    audit_tmp.write_event(
+        "unit_test.redact",
+        client_secret="top-level",
+        cfg={
+            "client_secret": "s3cr3t",
+            "auth": [{"refresh_token": "rt-xyz"}],
+            "api_key": "sk-123",
+            "prompt": "Resuma o panorama",
+            "messages": msgs,
+        },
+    )
+    audit_tmp.flush()
+
+    raw = pathlib.Path(audit_tmp._config().log_file).read_text("utf-8").splitlines()[-1]
+    for secret in ("top-level", "s3cr3t", "rt-xyz", "sk-123", "segredo no prompt"):
+        assert secret not in raw, f"Valor sensível vazou no log: {secret!r}"
+
+    rec = json.loads(raw)
+    cfg = rec["cfg"]
+    assert rec["client_secret"] == "[REDACTED]"
+    assert cfg["client_secret"] == "[REDACTED]"
+    assert cfg["auth"][0]["refresh_token"] == "[REDACTED]"
+    assert cfg["api_key"] == "[REDACTED]"
+    assert cfg["prompt"] == {
+        "sha": audit_tmp._hash("Resuma o panorama"),
+        "preview": "Resuma o panorama",
+    }
+    assert cfg["messages"]["count"] == 1 and len(cfg["messages"]["sha"]) == 12
+
+
+def test_span_error_survives_log_failure(audit_tmp, tmp_path, monkeypatch, capsys):
+    # Log quebrado não pode trocar a exceção real do span por um OSError
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("x", encoding="utf-8")
+    monkeypatch.setenv("LOG_FILE", str(blocker / "events.jsonl"))
+    audit_tmp._config.cache_clear()
+
+    with pytest.raises(ValueError, match="boom") as ei:
+        with audit_tmp.audit_span("unit_test_error", "r"):
+            raise ValueError("boom")
+    assert any("falha ao registrar" in n for n in ei.value.__notes__)
+    assert "[audit] falha ao gravar eventos" in capsys.readouterr().err
+
+
+def test_flush_reports_timeout(audit_tmp, monkeypatch):
+    # Fila que ninguém drena: o flush expira e não finge sucesso
+    with monkeypatch.context() as m:
+        m.setattr(audit_tmp, "_Q", audit_tmp.queue.SimpleQueue())
+        assert audit_tmp.flush(timeout=0.01) is False
+    assert audit_tmp.flush() is True
+
+
+def test_messages_fingerprint_is_backend_independent(monkeypatch):
+    # Mesmo conteúdo → mesmo sha, com ou sem orjson instalado
+    msgs = [{"role": "user", "content": "Olá, SRAG?"}]
+    with_backend = audit.sanitize_payload({"messages": msgs})["messages"]
+    monkeypatch.setattr(audit, "orjson", None)
+    without_backend = audit.sanitize_payload({"messages": msgs})["messages"]
+
+    canonical = json.dumps(msgs, separators=(",", ":"), ensure_ascii=False)
+    assert with_backend == without_backend == {"sha": audit._hash(canonical), "count": 1}
+
+
+def test_wide_int_is_logged(audit_tmp):
+    # orjson recusa int > 64 bits: o evento deve ser gravado via json da stdlib
+    audit_tmp.log_kv("r", "unit_test.wide_int", v=2**70)
+    audit_tmp.flush()
+
+    lines = pathlib.Path(audit_tmp._config().log_file).read_text("utf-8").splitlines()
+    assert json.loads(lines[-1])["v"] == 2**70
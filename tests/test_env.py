@@ -2,22 +2,35 @@ import os
 import pathlib
 import re
 
-from dotenv import find_dotenv, load_dotenv
+from dotenv import find_dotenv
 import pytest
 
 # Quando RUN_LIVE_API_TESTS=1, exigimos chaves reais e não vazias.
 RUN_LIVE = os.getenv("RUN_LIVE_API_TESTS", "0") == "1"
 
+# Padrões compilados uma única vez
+_UF_RE = re.compile(r"[A-Z]{2}")
+_URL_RE = re.compile(r"^https?://.+\.(csv|zip)$", re.IGNORECASE)
 
-@pytest.fixture(scope="session", autouse=True)
-def _load_env() -> None:
+# O .env é carregado uma única vez em tests/conftest.py (pytest_configure) e
+# exposto como `env_snapshot`.
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _require_env_file() -> None:
     """
-    Carrega o .env uma única vez (sem sobrescrever variáveis já definidas).
+    Estes testes validam o .env: ele precisa existir.
     No CI, o workflow cria um .env mínimo – então mantemos a asserção.
     """
-    env_file = find_dotenv(filename=".env", usecwd=True)
-    assert env_file, "Arquivo .env não encontrado no diretório do projeto."
-    load_dotenv(env_file, override=False)
+    assert find_dotenv(
+        filename=".env", usecwd=True
+    ), "Arquivo .env não encontrado no diretório do projeto."
+
+
+@pytest.fixture(scope="session")
+def env_var(env_snapshot, request) -> tuple[str, str | None]:
+    """(nome, valor) da variável parametrizada, lido do snapshot da sessão."""
+    return request.param, env_snapshot[request.param]
 
 
 # ------------------------------
@@ -25,31 +38,32 @@ def _load_env() -> None:
 # (variáveis core: sempre não vazias)
 # ------------------------------
 @pytest.mark.parametrize(
-    "var_name",
+    "env_var",
     [
         "DB_PATH",
         "UF_INICIAL",
         "INGEST_MODE",
         "NEWS_QUERY",
     ],
+    indirect=True,
 )
-def test_env_vars_presence(var_name: str):
-    val = os.getenv(var_name)
+def test_env_vars_presence(env_var):
+    var_name, val = env_var
     assert (
         val is not None and val.strip() != ""
     ), f"Variável {var_name} ausente ou vazia no .env"
 
 
-def test_db_path_parent_dir_exists():
-    db_path = os.getenv("DB_PATH")
+def test_db_path_parent_dir_exists(env_snapshot):
+    db_path = env_snapshot["DB_PATH"]
     parent = pathlib.Path(db_path).parent
     assert parent.exists(), f"Diretório pai de DB_PATH não existe: {parent}"
 
 
-def test_uf_inicial_format():
-    uf = os.getenv("UF_INICIAL", "")
+def test_uf_inicial_format(env_snapshot):
+    uf = env_snapshot["UF_INICIAL"] or ""
     assert (
-        re.fullmatch(r"[A-Z]{2}", uf) is not None
+        _UF_RE.fullmatch(uf) is not None
     ), f"UF_INICIAL inválido: '{uf}'. Use duas letras maiúsculas (ex.: 'SP')."
 
 
@@ -58,26 +72,26 @@ def test_uf_inicial_format():
 # (flexíveis no CI/offline; estritas em modo live)
 # ------------------------------
 @pytest.mark.parametrize("var_name", ["OPENAI_API_KEY", "SERPER_API_KEY"])
-def test_external_keys_present_or_required_when_live(var_name: str):
+def test_external_keys_present_or_required_when_live(env_snapshot, var_name: str):
     """
     - OFFLINE/CI (RUN_LIVE_API_TESTS != 1): a variável deve EXISTIR,
       mas pode estar vazia ("").
     - LIVE (RUN_LIVE_API_TESTS = 1): a variável deve estar NÃO VAZIA.
     """
-    val = os.getenv(var_name)
+    val = env_snapshot[var_name]
     assert val is not None, f"Variável {var_name} ausente no ambiente/.env"
 
     if RUN_LIVE:
         assert val.strip() != "", f"{var_name} vazia com RUN_LIVE_API_TESTS=1"
 
 
-def test_api_keys_look_sane():
+def test_api_keys_look_sane(env_snapshot):
     """
     Apenas em modo LIVE validamos formato mínimo das chaves.
     No CI/offline não exigimos conteúdo real.
     """
-    openai_key = os.getenv("OPENAI_API_KEY", "")
-    serper_key = os.getenv("SERPER_API_KEY", "")
+    openai_key = env_snapshot["OPENAI_API_KEY"] or ""
+    serper_key = env_snapshot["SERPER_API_KEY"] or ""
 
     if not RUN_LIVE:
         # Só garantimos que existem (podem estar vazias para evitar chamadas externas no CI)
@@ -95,8 +109,8 @@ def test_api_keys_look_sane():
 # ------------------------------
 # INGEST_MODE e SRAG_URLS
 # ------------------------------
-def test_ingest_mode_allowed_values():
-    mode = os.getenv("INGEST_MODE", "").lower()
+def test_ingest_mode_allowed_values(env_snapshot):
+    mode = (env_snapshot["INGEST_MODE"] or "").lower()
     assert mode in {
         "auto",
         "local",
@@ -104,18 +118,20 @@ def test_ingest_mode_allowed_values():
     }, f"INGEST_MODE inválido: '{mode}'. Use: auto | local | remote."
 
 
-def _split_env_urls(env_val: str) -> list[str]:
-    return [u.strip() for u in env_val.split(",") if u.strip()]
+@pytest.fixture(scope="session")
+def orchestrator_consts() -> tuple[str, str, list[str]]:
+    """(DB_PATH, INGEST_MODE, SRAG_URLS) já parseados pelo orquestrador (importa após load_dotenv)."""
+    from src.tools.db_orchestrator import DB_PATH, INGEST_MODE, SRAG_URLS
+
+    return DB_PATH, INGEST_MODE, SRAG_URLS
 
 
-def test_srag_urls_required_when_remote():
+def test_srag_urls_required_when_remote(orchestrator_consts):
     """
     Quando INGEST_MODE=remote, SRAG_URLS deve existir e conter >=1 URL.
     (Para auto/local, não exigimos.)
     """
-    mode = os.getenv("INGEST_MODE", "").lower()
-    urls_env = os.getenv("SRAG_URLS", "")
-    urls = _split_env_urls(urls_env)
+    _, mode, urls = orchestrator_consts
 
     if mode == "remote":
         assert (
@@ -123,17 +139,16 @@ def test_srag_urls_required_when_remote():
         ), "INGEST_MODE=remote exige SRAG_URLS no .env (1+ URLs separadas por vírgula)."
 
 
-def test_orchestrator_parses_urls_like_env():
+def test_orchestrator_parses_urls_like_env(env_snapshot, orchestrator_consts):
     """
     Garante que o orquestrador lê/parsa SRAG_URLS conforme o .env.
     Também valida formato básico das URLs (http/https, .csv ou .zip).
     """
-    # importa após load_dotenv
-    from src.tools.db_orchestrator import DB_PATH, INGEST_MODE, SRAG_URLS
+    DB_PATH, INGEST_MODE, SRAG_URLS = orchestrator_consts
 
     # 1) INGEST_MODE e DB_PATH sincronizados com o .env
-    assert INGEST_MODE == os.getenv("INGEST_MODE", "").lower()
-    assert DB_PATH == os.getenv("DB_PATH")
+    assert INGEST_MODE == (env_snapshot["INGEST_MODE"] or "").lower()
+    assert DB_PATH == env_snapshot["DB_PATH"]
 
     # 2) SRAG_URLS é lista (pode estar vazia se não for remoto)
     assert isinstance(SRAG_URLS, list), "SRAG_URLS no orquestrador deve ser uma lista."
@@ -141,7 +156,6 @@ def test_orchestrator_parses_urls_like_env():
     # 3) Se modo remoto, lista deve ter 1+ itens válidos
     if INGEST_MODE == "remote":
         assert len(SRAG_URLS) >= 1, "Modo remoto requer pelo menos 1 URL."
-        url_re = re.compile(r"^https?://.+\.(csv|zip)$", re.IGNORECASE)
         for u in SRAG_URLS:
-            assert url_re.match(u), f"URL inválida em SRAG_URLS: {u}"
+            assert _URL_RE.match(u), f"URL inválida em SRAG_URLS: {u}"
             assert u == u.strip(), f"URL com espaços extras: '{u}'"
@@ -1,29 +1,53 @@
 import os
-import pathlib
+import sqlite3
 
-import pandas as pd
 import pytest
-from sqlalchemy import create_engine
 
 
 @pytest.fixture(scope="session")
-def eng():
+def ro():
+    """Conexão sqlite3 somente leitura ao banco da ingestão (uma por sessão)."""
     db = os.getenv("DB_PATH", "data/srag.sqlite")
-    assert pathlib.Path(
-        db
-    ).exists(), "Banco SQLite não encontrado: rode a ingestão antes dos testes."
-    return create_engine(f"sqlite:///{db}", future=True)
+    # mode=ro não cria o arquivo: a própria abertura já valida a existência
+    try:
+        conn = sqlite3.connect(f"file:{db}?mode=ro", uri=True)
+    except sqlite3.OperationalError as e:
+        pytest.fail(
+            f"Banco SQLite não encontrado: rode a ingestão antes dos testes. ({e})"
+        )
+    yield conn
+    conn.close()
 
 
-def test_tables_exist(eng):
-    q = "SELECT name FROM sqlite_master WHERE type='table'"
-    names = set(pd.read_sql_query(q, eng)["name"].tolist())
+# Tabelas agregadas cujas contagens validamos
+_COUNTED = ("srag_daily", "srag_monthly")
+
+
+@pytest.fixture(scope="session")
+def db_tables(ro) -> set[str]:
+    """Tabelas existentes no banco (uma consulta por sessão)."""
+    return {r[0] for r in ro.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+
+@pytest.fixture(scope="session")
+def db_counts(ro, db_tables) -> dict[str, int | None]:
+    """
+    Contagens das tabelas agregadas numa única consulta (UNION ALL), só para as
+    que existem – tabela ausente fica como None em vez de quebrar o setup.
+    """
+    counts: dict[str, int | None] = dict.fromkeys(_COUNTED)
+    present = [t for t in _COUNTED if t in db_tables]
+    if present:
+        sql = " UNION ALL ".join(f"SELECT '{t}', COUNT(*) FROM {t}" for t in present)
+        counts.update(ro.execute(sql).fetchall())
+    return counts
+
+
+def test_tables_exist(db_tables):
     for t in ["srag_staging", "srag_base", "srag_daily", "srag_monthly"]:
-        assert t in names, f"Tabela {t} não foi criada."
+        assert t in db_tables, f"Tabela {t} não foi criada."
 
 
-def test_daily_monthly_have_rows(eng):
-    n_daily = pd.read_sql_query("SELECT COUNT(*) n FROM srag_daily", eng)["n"][0]
-    n_month = pd.read_sql_query("SELECT COUNT(*) n FROM srag_monthly", eng)["n"][0]
-    assert n_daily > 0, "srag_daily vazia."
-    assert n_month > 0, "srag_monthly vazia."
+def test_daily_monthly_have_rows(db_counts):
+    assert db_counts["srag_daily"], "srag_daily vazia ou ausente."
+    assert db_counts["srag_monthly"], "srag_monthly vazia ou ausente."
@@ -1,38 +1,52 @@
 import json
 import os
 
-from dotenv import find_dotenv, load_dotenv
 import pytest
-import requests
 
-# Carrega .env uma vez
-load_dotenv(find_dotenv(usecwd=True), override=False)
+# O .env é carregado antes da coleta em tests/conftest.py (pytest_configure).
 
-RUN_LIVE = os.getenv("RUN_LIVE_API_TESTS", "0") == "1"
+# Todos "integration"; fora do modo live o módulo inteiro é pulado (sem setup de
+# fixtures nem import de requests/openai).
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(
+        os.getenv("RUN_LIVE_API_TESTS", "0") != "1",
+        reason="Defina RUN_LIVE_API_TESTS=1 para rodar testes live (externos).",
+    ),
+]
 
-pytestmark = pytest.mark.integration  # marca todos como "integration"
 
+@pytest.fixture(scope="session")
+def http_session():
+    """Sessão HTTP única: reaproveita conexão TCP/TLS entre as chamadas live."""
+    import requests
 
-def _skip_if_not_live():
-    if not RUN_LIVE:
-        pytest.skip("Defina RUN_LIVE_API_TESTS=1 para rodar testes live (externos).")
+    s = requests.Session()
+    yield s
+    s.close()
 
 
-# ---------------------------
-# OpenAI
-# ---------------------------
-def test_openai_key_live_chat_completion():
-    _skip_if_not_live()
-
+@pytest.fixture(scope="session")
+def openai_client():
+    """Cliente OpenAI criado uma vez (transporte HTTPX/keep-alive compartilhado)."""
     key = os.getenv("OPENAI_API_KEY", "")
     assert key.strip(), "OPENAI_API_KEY ausente/vazia no .env"
 
     try:
-        from openai import OpenAI, RateLimitError  # lib oficial 1.x
+        from openai import OpenAI  # lib oficial 1.x
     except Exception as e:
         pytest.skip(f"Pacote openai não disponível: {e}")
 
-    client = OpenAI(api_key=key)
+    return OpenAI(api_key=key)
+
+
+# ---------------------------
+# OpenAI
+# ---------------------------
+def test_openai_key_live_chat_completion(openai_client):
+    from openai import RateLimitError
+
+    client = openai_client
     model = os.getenv("OPENAI_TEST_MODEL", "gpt-4o-mini")
     alt_model = os.getenv("OPENAI_ALT_TEST_MODEL", "gpt-4o-mini")  # pode repetir
 
@@ -68,9 +82,7 @@ def test_openai_key_live_chat_completion():
 # ---------------------------
 # Serper (Google News-like)
 # ---------------------------
-def test_serper_key_live_news():
-    _skip_if_not_live()
-
+def test_serper_key_live_news(http_session):
     key = os.getenv("SERPER_API_KEY", "")
     assert key.strip(), "SERPER_API_KEY ausente/vazia no .env"
 
@@ -79,7 +91,7 @@ def test_serper_key_live_news():
     payload = {"q": "SRAG Brasil", "num": 1}
 
     try:
-        r = requests.post(url, headers=headers, json=payload, timeout=20)
+        r = http_session.post(url, headers=headers, json=payload, timeout=20)
     except Exception as e:
         pytest.xfail(f"Falha de rede ao chamar Serper: {e}")
 
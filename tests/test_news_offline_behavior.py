@@ -1,23 +1,41 @@
-import importlib
+import types
 
+import pytest
 import requests
 
+import src.tools.news as news
 
-def test_news_offline_behaviour(monkeypatch):
-    # 1) Força modo offline: sem chaves
+
+def _clear_key_caches() -> None:
+    news._serper_key.cache_clear()
+    news._openai_key.cache_clear()
+
+
+@pytest.fixture
+def no_keys(monkeypatch):
+    """
+    Chaves vazias no ambiente, com as chaves em cache descartadas antes e depois
+    (teardown: o env é restaurado e o cache não guarda "" para o resto da sessão).
+    """
     monkeypatch.setenv("SERPER_API_KEY", "")
     monkeypatch.setenv("OPENAI_API_KEY", "")
+    _clear_key_caches()
+    yield monkeypatch
+    monkeypatch.undo()
+    _clear_key_caches()
 
-    # 2) Recarrega o módulo para que ele leia as vars atualizadas
-    import src.tools.news as news
 
-    importlib.reload(news)
+def test_news_offline_behaviour(no_keys):
+    # 1-2) Modo offline sem chaves (cache descartado) vem da fixture `no_keys`
+    monkeypatch = no_keys
 
-    # 3) Bloqueia qualquer tentativa de rede por segurança
+    # 3) Bloqueia qualquer tentativa de rede por segurança. O módulo usa uma
+    #    Session compartilhada (news._HTTP); requests.post também passa por
+    #    Session.request, então bloqueamos na origem.
     def _blocked(*args, **kwargs):  # se for chamado, falha o teste
-        raise AssertionError("requests.post não deve ser chamado em modo offline")
+        raise AssertionError("Nenhuma requisição HTTP deve ocorrer em modo offline")
 
-    monkeypatch.setattr(requests, "post", _blocked, raising=True)
+    monkeypatch.setattr(requests.Session, "request", _blocked, raising=True)
 
     # 4) search_news deve retornar lista vazia quando SERPER_API_KEY está ausente
     items = news.search_news("SRAG Brasil", num=1, run_id="t-offline")
@@ -36,3 +54,48 @@ def test_news_offline_behaviour(monkeypatch):
         "Esperava fallback indicando indisponibilidade quando OPENAI_API_KEY está vazia; "
         f"recebi: {summary_no_key!r}"
     )
+
+
+def _failing_client(*args, **kwargs):
+    """Cliente OpenAI falso cujo `chat.completions.create` sempre falha."""
+
+    def _create(**kw):
+        raise RuntimeError("boom")
+
+    return types.SimpleNamespace(
+        chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=_create))
+    )
+
+
+# Quatro manchetes: o resumo local usa só as 3 primeiras (fontes sem repetição)
+_ITEMS = [
+    {"title": "Alta de SRAG", "source": "Fonte A", "link": "https://a"},
+    {"title": "UTIs cheias", "source": "Fonte B", "link": "https://b"},
+    {"title": "Vacinação", "source": "Fonte A", "link": "https://c"},
+    {"title": "Fora do top 3", "source": "Fonte C", "link": "https://d"},
+]
+
+
+@pytest.fixture
+def failing_llm(monkeypatch):
+    """Caminho "live" com cliente OpenAI stubado para falhar (sem rede/retries)."""
+    monkeypatch.setenv("RUN_LIVE_API_TESTS", "1")
+    monkeypatch.setattr(news, "API_MAX_RETRIES", 0)
+    monkeypatch.setattr(news, "_get_openai_client", _failing_client)
+    return monkeypatch
+
+
+def test_summarize_local_fallback_when_enabled(failing_llm):
+    failing_llm.setenv("OPENAI_FALLBACK_LOCAL", "1")
+
+    summary = news.summarize_news(_ITEMS, run_id="t-fallback")
+    assert summary == (
+        "Destaques: Alta de SRAG | UTIs cheias | Vacinação (fontes: Fonte A, Fonte B)"
+    )
+
+
+def test_summarize_raises_when_local_fallback_disabled(failing_llm):
+    failing_llm.setenv("OPENAI_FALLBACK_LOCAL", "0")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        news.summarize_news(_ITEMS, run_id="t-fallback")
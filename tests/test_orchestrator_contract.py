@@ -2,17 +2,13 @@ import pathlib
 
 import pandas as pd
 
-import src.agents.orchestrator as orch_mod  # importa o módulo para monkeypatch em seu namespace
 
-
-def test_run_pipeline_contract(monkeypatch, tmp_path):
+def test_run_pipeline_contract(offline_stubs, monkeypatch, tmp_path):
     # ---- Stubs determinísticos ----
+    # Ingestão no-op e notícias sem rede vêm da fixture `offline_stubs` (conftest)
+    orch_mod = offline_stubs
 
-    # 1) ingestão: no-op
-    def fake_ingest():
-        return None
-
-    # 2) métricas: retorna KPIs e séries mínimas
+    # 1) métricas: retorna KPIs e séries mínimas
     def fake_compute_metrics(uf: str):
         return {
             "increase_rate": 0.10,
@@ -27,11 +23,11 @@ def test_run_pipeline_contract(monkeypatch, tmp_path):
             ),
         }
 
-    # 3) plot: não cria arquivo, apenas retorna o caminho recebido
+    # 2) plot: não cria arquivo, apenas retorna o caminho recebido
     def fake_plot_series(df, x_col, y_col, title, out_path):
         return out_path
 
-    # 4) render_html: grava um HTML mínimo no tmp e retorna o caminho
+    # 3) render_html: grava um HTML mínimo no tmp e retorna o caminho
     def fake_render_html(ctx: dict) -> str:
         reports_dir = tmp_path / "resources" / "reports"
         reports_dir.mkdir(parents=True, exist_ok=True)
@@ -51,25 +47,15 @@ def test_run_pipeline_contract(monkeypatch, tmp_path):
         out.write_text(html, encoding="utf-8")
         return str(out)
 
-    # 5) html_to_pdf: retorna None (simula PDF desativado/indisponível)
+    # 4) html_to_pdf: retorna None (simula PDF desativado/indisponível)
     def fake_html_to_pdf(html_path: str):
         return None
 
-    # 6) notícias: não chama rede
-    def fake_search_news(q: str, num: int = 5, run_id=None):
-        return []
-
-    def fake_summarize_news(items, run_id=None) -> str:
-        return "Sem notícias recentes encontradas."
-
     # ---- Aplica monkeypatch diretamente no namespace do orquestrador ----
-    monkeypatch.setattr(orch_mod, "ingest_csvs", fake_ingest, raising=True)
     monkeypatch.setattr(orch_mod, "compute_metrics", fake_compute_metrics, raising=True)
     monkeypatch.setattr(orch_mod, "plot_series", fake_plot_series, raising=True)
     monkeypatch.setattr(orch_mod, "render_html", fake_render_html, raising=True)
     monkeypatch.setattr(orch_mod, "html_to_pdf", fake_html_to_pdf, raising=True)
-    monkeypatch.setattr(orch_mod, "search_news", fake_search_news, raising=True)
-    monkeypatch.setattr(orch_mod, "summarize_news", fake_summarize_news, raising=True)
 
     # ---- Executa ----
     out = orch_mod.run_pipeline("SP")
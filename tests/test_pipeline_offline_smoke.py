@@ -1,20 +1,21 @@
-import os
+from pathlib import Path
 
 
-def test_pipeline_offline_end_to_end(monkeypatch):
+def test_pipeline_offline_end_to_end(offline_run):
     """
     Smoke test **OFFLINE** da pipeline de ponta a ponta.
 
     Objetivo
     --------
     Verificar que o orquestrador executa o fluxo completo sem depender de serviços
-    externos (download remoto, OpenAI, Serper). Para isso, o teste força
-    `INGEST_MODE=local`, o que faz a pipeline usar apenas os artefatos locais
-    (banco/CSVs) e seguir até a geração do relatório.
+    externos (download remoto, OpenAI, Serper). Para isso, a fixture de sessão
+    `offline_run` força `INGEST_MODE=local` (e chaves vazias) apenas durante a
+    execução, o que faz a pipeline usar só os artefatos locais (banco/CSVs) e
+    seguir até a geração do relatório. A execução acontece uma única vez por
+    sessão e é compartilhada pelos testes abaixo.
 
     O que validamos
     ---------------
-    - O ambiente foi ajustado para `INGEST_MODE=local`.
     - `run_pipeline("SP")` completa sem erro e retorna o dicionário canônico.
     - O caminho do HTML (`html_path`) está presente (relatório gerado).
 
@@ -24,16 +25,18 @@ def test_pipeline_offline_end_to_end(monkeypatch):
     - Este é um teste de fumaça (sanity) para garantir que a execução offline
       da pipeline não quebre e produz ao menos o HTML final.
     """
-    monkeypatch.setenv("INGEST_MODE", "local")
-    from src.agents.orchestrator import run_pipeline
+    # Deve existir um caminho para o HTML gerado
+    assert offline_run["html_path"]
 
-    # Confere que o ambiente foi realmente ajustado
-    assert os.getenv("INGEST_MODE") == "local"
 
-    out = run_pipeline("SP")
+def test_pipeline_offline_html_exists(offline_run):
+    """O HTML apontado em `html_path` existe em disco."""
+    assert Path(offline_run["html_path"]).exists()
 
-    # Deve existir um caminho para o HTML gerado
-    assert out["html_path"]
+
+def test_pipeline_offline_news_fallback(offline_run):
+    """Sem chaves/rede, o resumo de notícias cai no fallback determinístico."""
+    assert "Sem notícias recentes" in offline_run["news_summary"]
 
 
 def test_auto_mode_without_local_files_falls_back(monkeypatch):
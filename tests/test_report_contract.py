@@ -1,84 +1,81 @@
-import pathlib
 import re
 
-from src.reports.render import render_html
+# Expressão tolerante: aspas simples/duplas e ./ ou ../ opcionais
+# (uma única passada captura os dois gráficos)
+_SRC_CHARTS = re.compile(r'src=["\'](?:\./|\.\./)?charts/casos_(30d|12m)\.png["\']')
 
+# KPIs via data-testid (adicionados no template)
+_MUST_TESTIDS = (
+    'data-testid="kpi-increase"',
+    'data-testid="kpi-mortality"',
+    'data-testid="kpi-icu"',
+    'data-testid="kpi-vaccination"',
+)
 
-def _ensure_report() -> pathlib.Path:
+# Aceita sinônimos para compatibilizar o template atual
+_LABEL_VARIANTS = {
+    "taxa de aumento": ("taxa de aumento", "variação de casos"),
+    "taxa de mortalidade": ("taxa de mortalidade",),
+    "taxa de ocupação de uti": ("taxa de ocupação de uti", "taxa de uti"),
+    "taxa de vacinação": ("taxa de vacinação",),
+}
+
+# Seções principais (com o em dash do template)
+_MUST_SECTIONS = (
+    "casos — últimos 30 dias",
+    "casos — últimos 12 meses",
+    "contexto de notícias",
+    "relatório srag — uf sp",
+)
+
+
+# Trechos de texto (rótulos + seções), checados contra o HTML em minúsculas
+_TEXT_NEEDLES = (
+    *(o for opts in _LABEL_VARIANTS.values() for o in opts),
+    *_MUST_SECTIONS,
+)
+
+
+def _present(needles, text: str) -> set[str]:
     """
-    Garante que resources/reports/relatorio.html exista.
-    Se não existir, gera um HTML mínimo chamando render_html diretamente.
+    Trechos encontrados em `text` – um `in` (busca em C) por trecho, de modo que
+    trechos que começam na mesma posição (um prefixo de outro) são todos vistos.
     """
-    p = pathlib.Path("resources/reports/relatorio.html")
-    if p.exists():
-        return p
-
-    p.parent.mkdir(parents=True, exist_ok=True)
-
-    ctx = {
-        "uf": "SP",
-        "increase_rate": 0.12,
-        "mortality_rate": 0.034,
-        "icu_rate": 0.18,
-        "vaccination_rate": 0.77,
-        # use caminhos RELATIVOS; o orquestrador normalmente usa 'charts/...'
-        "chart_30d": "charts/casos_30d.png",
-        "chart_12m": "charts/casos_12m.png",
-        "news_summary": "Resumo fake para testes.",
-        "now": "01/01/2025 00:00",
-    }
-    out = render_html(ctx)
-    return pathlib.Path(out)
-
-
-def test_report_contract_exists_and_has_sections():
+    return {n for n in needles if n in text}
+
+
+def test_report_contract_exists_and_has_sections(report_html):
     """
     Contrato do HTML:
     - arquivo existe
     - KPIs com data-testids
     - rótulos/seções exigidos (tolerando pequenas variações de texto)
     """
-    p = _ensure_report()
+    p, html, html_lc = report_html
     assert p.exists(), "Falha ao gerar/achar o relatório HTML."
-    html = p.read_text(encoding="utf-8")
-    html_lc = html.lower()
-
-    # KPIs via data-testid (adicionados no template)
-    must_testids = [
-        'data-testid="kpi-increase"',
-        'data-testid="kpi-mortality"',
-        'data-testid="kpi-icu"',
-        'data-testid="kpi-vaccination"',
-    ]
-    missing_ids = [t for t in must_testids if t not in html]
-    assert not missing_ids, f"KPI(s) ausente(s) no HTML: {missing_ids}"
-
-    # Aceita sinônimos para compatibilizar o template atual
-    label_variants = {
-        "taxa de aumento": ["taxa de aumento", "variação de casos"],
-        "taxa de mortalidade": ["taxa de mortalidade"],
-        "taxa de ocupação de uti": ["taxa de ocupação de uti", "taxa de uti"],
-        "taxa de vacinação": ["taxa de vacinação"],
-    }
-
-    missing_labels = []
-    for canonical, options in label_variants.items():
-        if not any(opt in html_lc for opt in options):
-            missing_labels.append(canonical)
-    assert not missing_labels, f"Rótulos faltando no relatório: {missing_labels}"
-
-    # Seções principais (com o em dash do template)
-    must_sections = [
-        "casos — últimos 30 dias",
-        "casos — últimos 12 meses",
-        "contexto de notícias",
-        "relatório srag — uf sp",
-    ]
-    missing_sections = [s for s in must_sections if s not in html_lc]
-    assert not missing_sections, f"Seções faltando no relatório: {missing_sections}"
-
-
-def test_report_contract_image_paths_are_relative():
+
+    # Checagens com curto-circuito; a lista de ausentes (mensagem do assert)
+    # só é montada quando a asserção falha.
+    # data-testids: case-sensitive, contra o HTML original
+    ids = _present(_MUST_TESTIDS, html)
+    assert ids.issuperset(
+        _MUST_TESTIDS
+    ), f"KPI(s) ausente(s) no HTML: {[t for t in _MUST_TESTIDS if t not in ids]}"
+
+    # Os rótulos/seções esperados já estão em minúsculas
+    found = _present(_TEXT_NEEDLES, html_lc)
+
+    assert all(not found.isdisjoint(opts) for opts in _LABEL_VARIANTS.values()), (
+        "Rótulos faltando no relatório: "
+        f"{[c for c, opts in _LABEL_VARIANTS.items() if found.isdisjoint(opts)]}"
+    )
+
+    assert found.issuperset(
+        _MUST_SECTIONS
+    ), f"Seções faltando no relatório: {[s for s in _MUST_SECTIONS if s not in found]}"
+
+
+def test_report_contract_image_paths_are_relative(report_html):
     """
     Caminhos dos gráficos devem ser RELATIVOS.
     Aceita:
@@ -88,12 +85,8 @@ def test_report_contract_image_paths_are_relative():
     (idem para 12m)
     E aceita aspas simples OU duplas no atributo src.
     """
-    p = _ensure_report()
-    html = p.read_text(encoding="utf-8")
-
-    # Expressões tolerantes: aspas simples/duplas e ./ ou ../ opcionais
-    pat_30d = r'src=["\'](?:\./|\.\./)?charts/casos_30d\.png["\']'
-    pat_12m = r'src=["\'](?:\./|\.\./)?charts/casos_12m\.png["\']'
+    _, html, _ = report_html
+    found = {m.group(1) for m in _SRC_CHARTS.finditer(html)}
 
-    assert re.search(pat_30d, html), "Gráfico 30d não embutido como caminho relativo."
-    assert re.search(pat_12m, html), "Gráfico 12m não embutido como caminho relativo."
+    assert "30d" in found, "Gráfico 30d não embutido como caminho relativo."
+    assert "12m" in found, "Gráfico 12m não embutido como caminho relativo."
@@ -1,35 +1,39 @@
-import datetime
-
+import numpy as np
 import pandas as pd
+import pytest
 
 from src.utils.validate import clamp_future_dates, validate_uf
 
 
-def test_validate_uf_ok():
-    assert validate_uf("sp") == "SP"
-    assert validate_uf("RJ") == "RJ"
-
+@pytest.mark.parametrize("inp,exp", [("sp", "SP"), ("RJ", "RJ")])
+def test_validate_uf_ok(inp, exp):
+    assert validate_uf(inp) == exp
 
-def test_validate_uf_fail():
-    import pytest
 
+@pytest.mark.parametrize("inp", ["XX", ""])
+def test_validate_uf_fail(inp):
     with pytest.raises(ValueError):
-        validate_uf("XX")
-    with pytest.raises(ValueError):
-        validate_uf("")
+        validate_uf(inp)
 
 
-def test_clamp_future_dates():
-    # Usa a mesma referência de "hoje" que a função: data em UTC (timezone-aware -> date -> Timestamp naive)
-    today = pd.Timestamp(datetime.datetime.now(datetime.UTC).date())
-    df = pd.DataFrame(
-        {
-            "day": [today, today + pd.Timedelta(days=1)],
-            "cases": [1, 2],
-        }
-    )
-    out = clamp_future_dates(df, "day")
+def test_clamp_future_dates(future_df, today_utc):
+    out = clamp_future_dates(future_df, "day")
 
     # Deve remover o registro do futuro e manter o de hoje
     assert len(out) == 1
-    assert out.iloc[0]["day"] == today
+    assert out.iloc[0]["day"] == today_utc
+
+
+@pytest.mark.parametrize("unit", ["s", "ms", "us"])
+def test_clamp_future_dates_keeps_non_ns_unit(unit):
+    # Datas fora da faixa de datetime64[ns] (1677–2262) não podem estourar
+    days = np.array(
+        ["1500-01-01", "2020-01-01", "2300-01-01"], dtype=f"datetime64[{unit}]"
+    )
+    df = pd.DataFrame({"day": days, "cases": [1, 2, 3]})
+
+    out = clamp_future_dates(df, "day")
+
+    assert out["day"].dtype == df["day"].dtype
+    assert list(out["cases"]) == [1, 2]
+    assert list(out["day"]) == [pd.Timestamp("1500-01-01"), pd.Timestamp("2020-01-01")]